@@ -5,6 +5,9 @@ Configuration settings for the Mauritania Chatbot
 # API Configuration
 GROQ_API_KEY = "your_api_key_here"  # Will be overridden by .env
 GROQ_MODEL = "llama-3.3-70b-versatile"
+GROQ_RETRIES = 1                # retries on rate limits/server errors within a time budget
+GROQ_MIN_ATTEMPT_TIME = 2.0     # minimum seconds left in the budget to start a retry
+GROQ_RETRY_BACKOFF = 0.5        # seconds to wait before retrying
 
 # Embedding Model
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
@@ -18,4 +21,22 @@ RAG_MIN_SIMILARITY = 0.05
 APP_TITLE = "🇲🇷 مساعد الخدمات الموريتانية"
 APP_DESCRIPTION = "Assistant Services Publics Mauritaniens"
 APP_PORT = 7860
-APP_HOST = "0.0.0.0"
\ No newline at end of file
+APP_HOST = "0.0.0.0"
+
+# Semantic Cache Settings
+SEMANTIC_CACHE_THRESHOLD = 0.90
+SEMANTIC_CACHE_MAX_ENTRIES = 512
+SEMANTIC_CACHE_MAX_BYTES = 2 * 1024 * 1024   # vector matrix (~0.75 MB at 384 dims) plus answers
+
+# Query Embedding Memo Settings
+EMBEDDING_CACHE_SIZE = 1024         # normalized queries whose embeddings are reused
+EMBEDDING_CONCURRENCY = 2           # concurrent SentenceTransformer encodes
+
+# Admission Control Settings
+ADMISSION_MAX_ACTIVE = 4        # concurrent Groq generations
+ADMISSION_MAX_QUEUE = 16        # requests waiting for a Groq slot
+ADMISSION_PER_IP = 8            # in-flight Groq requests per client IP (NAT/proxy users share one)
+ADMISSION_PER_SESSION = 2       # in-flight Groq requests per browser session
+ADMISSION_DEADLINE = 20.0       # seconds per request, queue wait included
+ADMISSION_SHED_LATENCY = 8.0    # Groq latency estimate (s) above which requests go local
+ADMISSION_MIN_GROQ_TIME = 2.0   # minimum seconds left before the deadline to still call Groq
\ No newline at end of file
@@ -4,6 +4,7 @@ Main chatbot class that orchestrates RAG and Groq integration
 import time
 from core.rag_system import RAGSystem
 from core.groq_client import GroqClient
+from utils.normalization import normalize_query
 
 
 class MauritaniaChatbot:
@@ -94,40 +95,85 @@ Votre mission:
 Votre style: amical, clair, organisé
 """
     
-    def answer(self, query: str, lang: str = "fr"):
+    def retrieve(self, query: str, lang: str = "fr"):
         """
-        Main method to answer user queries
+        Resolve a query to a service and check the semantic cache, without calling Groq
         
         Args:
             query: User question
             lang: Response language ('fr' or 'ar')
             
         Returns:
-            Formatted answer
+            Dict with the retrieval state; its 'reply' is set when no Groq call is needed
         """
+        norm = normalize_query(query)
+        
         # Search for relevant services
-        results = self.rag.search(query)
+        q_emb = self.rag.embed(query, norm)
+        results = self.rag.search(query, q_emb=q_emb, norm=norm)
         
         if not results:
             if lang == "ar":
-                return "⚠️ لم أجد معلومات عن هذا السؤال.\n\nيرجى إعادة صياغة سؤالك."
+                reply = "⚠️ لم أجد معلومات عن هذا السؤال.\n\nيرجى إعادة صياغة سؤالك."
             else:
-                return "⚠️ Je n'ai pas trouvé d'informations sur cette question.\n\nVeuillez reformuler."
+                reply = "⚠️ Je n'ai pas trouvé d'informations sur cette question.\n\nVeuillez reformuler."
+            return {"query": query, "lang": lang, "reply": reply}
         
         svc = results[0]['svc']
+        sid = results[0]['id']
+        source_label = svc['name_ar'] if lang == "ar" else svc['name_fr']
+        state = {"query": query, "lang": lang, "q_emb": q_emb, "svc": svc, "sid": sid,
+                 "source_label": source_label, "reply": None}
+        
+        # Serve paraphrases of earlier questions from the semantic cache
+        cached = self.rag.cache.get(q_emb, lang, sid)
+        if cached:
+            state["reply"] = f"{cached}\n\n📚 Source: {source_label}"
+        return state
+    
+    def generate(self, state, use_groq: bool = True, timeout: float = None):
+        """
+        Answer a retrieved query with Groq, falling back to the local reply
+        
+        Args:
+            state: Result of retrieve() with no 'reply' set
+            use_groq: Set False to skip Groq and answer from local data only
+            timeout: Groq time budget in seconds
+            
+        Returns:
+            Formatted answer
+        """
+        query, lang, svc = state["query"], state["lang"], state["svc"]
+        source_label = state["source_label"]
+        
         context = self._build_context(svc)
         system_prompt = self._get_system_prompt(lang)
         
         # Try to use Groq if available
-        if self.groq.available:
+        if use_groq and self.groq.available:
             full_context = f"{context}\n\nQuestion: {query}"
-            response = self.groq.generate(system_prompt, full_context, lang=lang)
+            response = self.groq.generate(system_prompt, full_context, lang=lang, timeout=timeout)
             
             if response:
-                source_label = svc['name_ar'] if lang == "ar" else svc['name_fr']
+                self.rag.cache.put(state["q_emb"], lang, state["sid"], response)
                 return f"{response}\n\n📚 Source: {source_label}"
         
         # Fallback to local reply
         local = self._build_local_reply(svc, lang)
-        source_label = svc['name_ar'] if lang == "ar" else svc['name_fr']
-        return f"{local}\n\n📚 Source: {source_label}"
\ No newline at end of file
+        return f"{local}\n\n📚 Source: {source_label}"
+    
+    def answer(self, query: str, lang: str = "fr"):
+        """
+        Main method to answer user queries
+        
+        Args:
+            query: User question
+            lang: Response language ('fr' or 'ar')
+            
+        Returns:
+            Formatted answer
+        """
+        state = self.retrieve(query, lang)
+        if state["reply"]:
+            return state["reply"]
+        return self.generate(state)
\ No newline at end of file
@@ -1,14 +1,16 @@
 """
 Groq API client with robust response parsing and language checking
 """
-import re
-from groq import Groq
+import time
+from groq import Groq, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
 
-from config import GROQ_MODEL
+from config import GROQ_MODEL, GROQ_RETRIES, GROQ_MIN_ATTEMPT_TIME, GROQ_RETRY_BACKOFF
+from utils.normalization import is_in_lang
 
 
 class GroqClient:
     def __init__(self, api_key: str):
+        self.latency_estimate = 0.0
         if not api_key:
             print("⚠️ WARNING: No Groq API key!")
             self.client = None
@@ -90,12 +92,16 @@ class GroqClient:
         """Check if response is in the expected language"""
         if not text or not isinstance(text, str):
             return False
-        if lang == "ar":
-            return bool(re.search(r'[\u0600-\u06FF]', text))
+        return is_in_lang(text, lang)
+    
+    def _record_latency(self, elapsed: float):
+        """Update the exponentially weighted Groq latency estimate"""
+        if self.latency_estimate:
+            self.latency_estimate = 0.8 * self.latency_estimate + 0.2 * elapsed
         else:
-            return bool(re.search(r'[A-Za-z]', text))
+            self.latency_estimate = elapsed
     
-    def generate(self, system_prompt: str, user_message: str, lang: str = "fr"):
+    def generate(self, system_prompt: str, user_message: str, lang: str = "fr", timeout: float = None):
         """
         Generate response using Groq API
         
@@ -103,6 +109,7 @@ class GroqClient:
             system_prompt: System instruction
             user_message: User query
             lang: Target language ('fr' or 'ar')
+            timeout: Overall time budget in seconds, retries included (SDK defaults if omitted)
             
         Returns:
             Generated text or None
@@ -110,18 +117,44 @@ class GroqClient:
         if not self.available or not self.client:
             return None
         
-        try:
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                model=GROQ_MODEL,
-                temperature=0.7,
-                max_tokens=500,
-                top_p=0.9
-            )
+        deadline = time.time() + timeout if timeout is not None else None
+        attempts = GROQ_RETRIES + 1 if deadline is not None else 1
+        for attempt in range(attempts):
+            client = self.client
+            budget = None
+            if deadline is not None:
+                budget = deadline - time.time()
+                if attempt and budget < GROQ_MIN_ATTEMPT_TIME:
+                    break
+                # Retry here rather than in the SDK so every attempt fits the remaining budget
+                client = client.with_options(timeout=budget, max_retries=0)
+            start = time.time()
+            try:
+                response = client.chat.completions.create(
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_message}
+                    ],
+                    model=GROQ_MODEL,
+                    temperature=0.7,
+                    max_tokens=500,
+                    top_p=0.9
+                )
+            except APITimeoutError as e:
+                # A timeout means Groq is at least this slow; other fast failures say nothing about latency
+                self._record_latency(budget if budget is not None else time.time() - start)
+                print(f"❌ Generation timeout: {e}")
+                return None
+            except (RateLimitError, InternalServerError, APIConnectionError) as e:
+                print(f"❌ Generation error: {e}")
+                if attempt + 1 < attempts:
+                    time.sleep(GROQ_RETRY_BACKOFF)
+                continue
+            except Exception as e:
+                print(f"❌ Generation error: {e}")
+                return None
             
+            self._record_latency(time.time() - start)
             content = self._extract_content_from_response(response)
             
             # Validate response
@@ -131,6 +164,4 @@ class GroqClient:
                 return None
             
             return content.strip()
-        except Exception as e:
-            print(f"❌ Generation error: {e}")
-            return None
\ No newline at end of file
+        return None
\ No newline at end of file
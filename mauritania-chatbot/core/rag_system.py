@@ -1,11 +1,19 @@
 """
 RAG (Retrieval Augmented Generation) system for service retrieval
 """
+import threading
+from collections import OrderedDict
+
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
-from config import EMBEDDING_MODEL, RAG_TOP_K, RAG_SIMILARITY_THRESHOLD, RAG_MIN_SIMILARITY
+from config import (
+    EMBEDDING_MODEL, RAG_TOP_K, RAG_SIMILARITY_THRESHOLD, RAG_MIN_SIMILARITY,
+    EMBEDDING_CACHE_SIZE, EMBEDDING_CONCURRENCY
+)
 from services.database import SERVICES_DB
+from core.semantic_cache import SemanticCache
+from utils.normalization import normalize, normalize_query
 
 
 class RAGSystem:
@@ -14,6 +22,10 @@ class RAGSystem:
         self.embedder = SentenceTransformer(EMBEDDING_MODEL)
         self.kb = []
         self.embeddings = None
+        self.cache = SemanticCache()
+        self._emb_cache = OrderedDict()
+        self._emb_lock = threading.Lock()
+        self._encode_slots = threading.BoundedSemaphore(EMBEDDING_CONCURRENCY)
         self._build_kb()
         print(f"✅ RAG ready: {len(self.kb)} documents")
     
@@ -21,20 +33,18 @@ class RAGSystem:
         """Build knowledge base from services database"""
         for sid, svc in SERVICES_DB.items():
             text = f"Service: {svc['name_fr']} / {svc['name_ar']}. Description: {svc['description']}"
-            self.kb.append({"text": text, "id": sid, "svc": svc})
+            keywords = [normalize(k) for k in svc.get("keywords", [])]
+            self.kb.append({"text": text, "id": sid, "svc": svc, "keywords": keywords})
         
         texts = [x["text"] for x in self.kb]
         self.embeddings = self.embedder.encode(texts, convert_to_numpy=True)
     
-    def _keyword_match(self, query_lower: str):
+    def _keyword_match(self, query_norm: str):
         """Fallback keyword matching for robust search"""
         scores = {}
         for entry in self.kb:
-            sid = entry["id"]
-            svc = entry["svc"]
-            kws = [k.lower() for k in svc.get("keywords", [])]
-            count = sum(1 for kw in kws if kw in query_lower)
-            scores[sid] = count
+            count = sum(1 for kw in entry["keywords"] if kw in query_norm)
+            scores[entry["id"]] = count
         
         best_sid = max(scores, key=lambda k: scores[k])
         if scores[best_sid] > 0:
@@ -43,19 +53,43 @@ class RAGSystem:
                     return [entry]
         return []
     
-    def search(self, query: str, top_k: int = RAG_TOP_K):
+    def embed(self, query: str, norm=None):
+        """Encode a single query, reusing the embedding of identical normalized queries"""
+        key = (norm or normalize_query(query)).text
+        with self._emb_lock:
+            q_emb = self._emb_cache.get(key)
+            if q_emb is not None:
+                self._emb_cache.move_to_end(key)
+                return q_emb
+        
+        # Bound CPU-heavy encodes so a traffic spike cannot oversubscribe the host
+        with self._encode_slots:
+            q_emb = self.embedder.encode([query], convert_to_numpy=True)[0]
+        with self._emb_lock:
+            self._emb_cache[key] = q_emb
+            if len(self._emb_cache) > EMBEDDING_CACHE_SIZE:
+                self._emb_cache.popitem(last=False)
+        return q_emb
+    
+    def search(self, query: str, top_k: int = RAG_TOP_K, q_emb=None, norm=None):
         """
         Search for relevant services using embeddings and keyword matching
         
         Args:
             query: User query
             top_k: Number of results to return
+            q_emb: Precomputed query embedding (encoded here if omitted)
+            norm: Precomputed NormalizedQuery (normalized here if omitted)
             
         Returns:
             List of relevant service entries
         """
+        if norm is None:
+            norm = normalize_query(query)
+        
         # Embedding similarity search
-        q_emb = self.embedder.encode([query], convert_to_numpy=True)[0]
+        if q_emb is None:
+            q_emb = self.embed(query, norm)
         sims = np.dot(self.embeddings, q_emb) / (
             np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(q_emb) + 1e-10
         )
@@ -69,8 +103,7 @@ class RAGSystem:
             return [r["entry"] for r in top_results if r["score"] > 0.15]
         
         # Otherwise try keyword matching
-        qlow = query.lower()
-        kw_results = self._keyword_match(qlow)
+        kw_results = self._keyword_match(norm.expanded)
         if kw_results:
             return kw_results
         
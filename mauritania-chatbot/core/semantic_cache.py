@@ -0,0 +1,101 @@
+"""
+Semantic answer cache keyed by query embeddings
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from config import SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MAX_ENTRIES, SEMANTIC_CACHE_MAX_BYTES
+
+
+class SemanticCache:
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+                 max_bytes: int = SEMANTIC_CACHE_MAX_BYTES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Unit vectors live in a preallocated matrix; _entries maps slot -> metadata in LRU order.
+        # _bytes counts the matrix once plus the UTF-8 size of each cached answer.
+        self._vectors = None
+        self._entries = OrderedDict()
+        self._free = list(range(max_entries - 1, -1, -1))
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _normalize(self, emb):
+        """Return the embedding as a float32 unit vector"""
+        vec = np.asarray(emb, dtype=np.float32).ravel()
+        return vec / (np.linalg.norm(vec) + 1e-10)
+
+    def _evict_oldest(self):
+        """Drop the least recently used entry (lock must be held)"""
+        slot, entry = self._entries.popitem(last=False)
+        self._bytes -= entry["size"]
+        self._free.append(slot)
+        self.evictions += 1
+
+    def get(self, q_emb, lang: str, service_id: str):
+        """
+        Look up a cached answer for a semantically similar query
+
+        Args:
+            q_emb: Query embedding
+            lang: Response language ('fr' or 'ar')
+            service_id: Service the query resolved to
+
+        Returns:
+            Cached answer or None
+        """
+        with self._lock:
+            slots = [s for s, e in self._entries.items()
+                     if e["lang"] == lang and e["sid"] == service_id]
+            if slots:
+                sims = self._vectors[slots] @ self._normalize(q_emb)
+                best = int(np.argmax(sims))
+                if sims[best] >= self.threshold:
+                    slot = slots[best]
+                    self._entries.move_to_end(slot)
+                    self.hits += 1
+                    return self._entries[slot]["answer"]
+            self.misses += 1
+            return None
+
+    def put(self, q_emb, lang: str, service_id: str, answer: str):
+        """Store an answer for the given query embedding, evicting LRU entries as needed"""
+        if not answer or self.max_entries <= 0:
+            return
+        vec = self._normalize(q_emb)
+        size = len(answer.encode("utf-8"))
+        matrix_bytes = self.max_entries * vec.nbytes
+        if matrix_bytes + size > self.max_bytes:
+            return
+
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.max_entries, vec.shape[0]), dtype=np.float32)
+                self._bytes += self._vectors.nbytes
+            while self._entries and (not self._free or self._bytes + size > self.max_bytes):
+                self._evict_oldest()
+
+            slot = self._free.pop()
+            self._vectors[slot] = vec
+            self._entries[slot] = {"lang": lang, "sid": service_id, "answer": answer, "size": size}
+            self._bytes += size
+
+    def stats(self):
+        """Return cache size and hit-rate metrics"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
\ No newline at end of file
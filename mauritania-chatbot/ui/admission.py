@@ -0,0 +1,135 @@
+"""
+Admission control and load shedding for chat requests
+"""
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
+from config import (
+    ADMISSION_MAX_ACTIVE, ADMISSION_MAX_QUEUE, ADMISSION_PER_IP, ADMISSION_PER_SESSION,
+    ADMISSION_DEADLINE, ADMISSION_SHED_LATENCY, ADMISSION_MIN_GROQ_TIME
+)
+
+# Lower values are served first; ties are served in arrival order
+PRIORITY_FIRST_MESSAGE = 0
+PRIORITY_DEFAULT = 1
+
+
+class AdmissionController:
+    def __init__(self, max_active: int = ADMISSION_MAX_ACTIVE, max_queue: int = ADMISSION_MAX_QUEUE,
+                 per_ip: int = ADMISSION_PER_IP, per_session: int = ADMISSION_PER_SESSION,
+                 deadline: float = ADMISSION_DEADLINE, shed_latency: float = ADMISSION_SHED_LATENCY,
+                 min_remaining: float = ADMISSION_MIN_GROQ_TIME):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.per_ip = per_ip
+        self.per_session = per_session
+        self.deadline = deadline
+        self.shed_latency = shed_latency
+        self.min_remaining = min_remaining
+        self._cond = threading.Condition()
+        self._active = 0
+        self._queue = []
+        self._seq = itertools.count()
+        self._ips = {}
+        self._sessions = {}
+        self.admitted = 0
+        self.shed = 0
+        self.total_wait = 0.0
+
+    def _should_shed(self, ip: str, session: str, latency_estimate: float) -> bool:
+        """Decide whether a new request skips the queue (lock must be held)"""
+        if self._ips.get(ip, 0) >= self.per_ip:
+            return True
+        if session and self._sessions.get(session, 0) >= self.per_session:
+            return True
+        if len(self._queue) >= self.max_queue:
+            return True
+        # With nothing in flight, let one request through so the latency estimate can recover
+        return self._active > 0 and latency_estimate > self.shed_latency
+
+    def _track(self, ip: str, session: str, delta: int):
+        """Add delta to the in-flight counts of an IP and session (lock must be held)"""
+        for counts, key in ((self._ips, ip), (self._sessions, session)):
+            if not key:
+                continue
+            count = counts.get(key, 0) + delta
+            if count > 0:
+                counts[key] = count
+            else:
+                counts.pop(key, None)
+
+    @contextmanager
+    def admit(self, ip: str, session: str = None, latency_estimate: float = 0.0,
+              deadline: float = None, priority: int = PRIORITY_DEFAULT):
+        """
+        Wait for a remote generation slot within the request deadline
+
+        Args:
+            ip: Client IP address
+            session: Gradio session hash, capped separately from the IP
+            latency_estimate: Current Groq latency estimate in seconds
+            deadline: Absolute time.monotonic() deadline (now + configured deadline if omitted)
+            priority: PRIORITY_FIRST_MESSAGE or PRIORITY_DEFAULT
+
+        Yields:
+            Remaining seconds before the deadline (at least min_remaining), or None if
+            the request was shed and must be served locally
+        """
+        start = time.monotonic()
+        expires = deadline if deadline is not None else start + self.deadline
+        # Stop waiting once too little time is left for a useful Groq call
+        last_start = expires - self.min_remaining
+
+        with self._cond:
+            if self._should_shed(ip, session, latency_estimate):
+                self.shed += 1
+                admitted = False
+            else:
+                self._track(ip, session, 1)
+                ticket = (priority, next(self._seq))
+                heapq.heappush(self._queue, ticket)
+                # Only the head of the queue may take a free slot, so arrivals never jump ahead
+                while not (self._active < self.max_active and self._queue[0] == ticket):
+                    remaining = last_start - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                admitted = (self._active < self.max_active and self._queue[0] == ticket
+                            and time.monotonic() < last_start)
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                if admitted:
+                    self._active += 1
+                    self.admitted += 1
+                    self.total_wait += time.monotonic() - start
+                else:
+                    self._track(ip, session, -1)
+                    self.shed += 1
+                # The queue head changed; let the new head re-check for a free slot
+                self._cond.notify_all()
+
+        if not admitted:
+            yield None
+            return
+
+        try:
+            yield expires - time.monotonic()
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._track(ip, session, -1)
+                self._cond.notify_all()
+
+    def stats(self):
+        """Return queue depth, shed count and wait time metrics"""
+        with self._cond:
+            return {
+                "active": self._active,
+                "queue_depth": len(self._queue),
+                "admitted": self.admitted,
+                "shed": self.shed,
+                "avg_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+            }
\ No newline at end of file
@@ -4,13 +4,15 @@ Gradio user interface for the chatbot
 import gradio as gr
 import time
 from core.chatbot import MauritaniaChatbot
+from ui.admission import AdmissionController, PRIORITY_FIRST_MESSAGE, PRIORITY_DEFAULT
 from services.database import SERVICES_DB
-from config import APP_TITLE, APP_DESCRIPTION
+from config import APP_TITLE, APP_DESCRIPTION, ADMISSION_DEADLINE, ADMISSION_MAX_ACTIVE, ADMISSION_MAX_QUEUE
 
 
 def create_ui(api_key: str):
     """Create and configure the Gradio interface"""
     bot = MauritaniaChatbot(api_key)
+    admission = AdmissionController()
     
     def normalize_history(history):
         """
@@ -34,13 +36,47 @@ def create_ui(api_key: str):
                 continue
         return normalized
     
-    def chat_fn(msg, history, lang):
+    def client_ip(request):
+        """Get the client IP, using the address recorded by a reverse proxy if present"""
+        if not request:
+            return "anonymous"
+        forwarded = request.headers.get("x-forwarded-for") if request.headers else None
+        if forwarded:
+            # The rightmost entry is the one appended by our own proxy; earlier ones are client-supplied
+            return forwarded.split(",")[-1].strip()
+        return getattr(request.client, "host", None) or "anonymous"
+    
+    def status_text():
+        """Build the status line with serving metrics"""
+        text = "✅ Groq connecté!" if bot.groq.available else "⚠️ Mode hors ligne"
+        adm = admission.stats()
+        cache = bot.rag.cache.stats()
+        return (
+            f"**Status:** {text}  \n"
+            f"📊 File: {adm['queue_depth']} · Délestés: {adm['shed']} · "
+            f"Attente moy.: {adm['avg_wait']:.2f}s · Cache: {cache['hit_rate']:.0%}"
+        )
+    
+    def chat_fn(msg, history, lang, request: gr.Request):
         """Handle chat interactions"""
         if not msg or not msg.strip():
-            return history or [], ""
+            return history or [], "", status_text()
         
         start = time.time()
-        resp = bot.answer(msg, lang)
+        # The deadline covers retrieval as well as the wait for a Groq slot
+        deadline = time.monotonic() + ADMISSION_DEADLINE
+        state = bot.retrieve(msg, lang)
+        if state["reply"]:
+            resp = state["reply"]
+        elif not bot.groq.available:
+            resp = bot.generate(state, use_groq=False)
+        else:
+            session = request.session_hash if request else None
+            priority = PRIORITY_DEFAULT if history else PRIORITY_FIRST_MESSAGE
+            with admission.admit(client_ip(request), session, bot.groq.latency_estimate,
+                                 deadline=deadline, priority=priority) as remaining:
+                # Shed requests are answered locally instead of waiting on Groq
+                resp = bot.generate(state, use_groq=remaining is not None, timeout=remaining)
         elapsed = time.time() - start
         resp_with_time = f"{resp}\n\n⚡ {elapsed:.2f}s"
         
@@ -48,7 +84,7 @@ def create_ui(api_key: str):
         history_msgs.append({'role': 'user', 'content': str(msg)})
         history_msgs.append({'role': 'assistant', 'content': resp_with_time})
         
-        return history_msgs, ""
+        return history_msgs, "", status_text()
     
     def get_services(lang):
         """Get list of available services for display"""
@@ -116,8 +152,7 @@ def create_ui(api_key: str):
                 
                 clear = gr.Button("🗑️ Effacer / مسح", size="sm")
                 
-                status_text = "✅ Groq connecté!" if bot.groq.available else "⚠️ Mode hors ligne"
-                status = gr.Markdown(f"**Status:** {status_text}")
+                status = gr.Markdown(status_text())
             
             # Sidebar with services and quick questions
             with gr.Column(scale=1):
@@ -153,8 +188,12 @@ def create_ui(api_key: str):
         lang.change(get_services, inputs=[lang], outputs=[services])
         demo.load(lambda: get_services("fr"), outputs=[services])
         
-        send.click(chat_fn, [msg_box, chatbot_ui, lang], [chatbot_ui, msg_box])
-        msg_box.submit(chat_fn, [msg_box, chatbot_ui, lang], [chatbot_ui, msg_box])
+        send.click(chat_fn, [msg_box, chatbot_ui, lang], [chatbot_ui, msg_box, status])
+        msg_box.submit(chat_fn, [msg_box, chatbot_ui, lang], [chatbot_ui, msg_box, status])
         clear.click(lambda: [], outputs=[chatbot_ui])
     
+    # Enough workers that requests reach the admission controller (and are shed) instead of
+    # piling up in Gradio's queue; embedding work is bounded separately in RAGSystem
+    demo.queue(default_concurrency_limit=2 * (ADMISSION_MAX_ACTIVE + ADMISSION_MAX_QUEUE))
+    
     return demo
\ No newline at end of file
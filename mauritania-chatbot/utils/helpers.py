@@ -3,6 +3,8 @@ Utility functions for the chatbot
 """
 import re
 
+from utils.normalization import is_in_lang
+
 
 def clean_text(text: str) -> str:
     """Clean and normalize text"""
@@ -32,13 +34,5 @@ def validate_language(text: str, lang: str) -> bool:
     if not text:
         return False
     
-    if lang == "ar":
-        # Check for Arabic characters
-        arabic_chars = bool(re.search(r'[\u0600-\u06FF]', text))
-        # Also allow numbers and basic punctuation
-        non_arabic_chars = sum(1 for c in text if c.isalpha() and not ('\u0600' <= c <= '\u06FF'))
-        return arabic_chars and non_arabic_chars < len(text) * 0.3
-    else:
-        # For French, check for Latin characters
-        latin_chars = bool(re.search(r'[A-Za-z]', text))
-        return latin_chars
\ No newline at end of file
+    # Arabic text may contain numbers, punctuation and a few Latin words
+    return is_in_lang(text, lang, max_foreign_ratio=0.3)
\ No newline at end of file
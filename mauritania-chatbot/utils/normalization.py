@@ -0,0 +1,130 @@
+"""
+Query normalization and language detection shared by retrieval and validation
+"""
+import re
+from typing import NamedTuple, Optional
+
+
+# Arabic: drop tatweel and harakat, unify alef/yeh/teh marbuta variants.
+# French: fold accents and ligatures, unify typographic apostrophes.
+_ARABIC_MAP = {
+    "\u0640": None,                      # tatweel
+    "\u0623": "\u0627", "\u0625": "\u0627",  # alef with hamza above/below -> alef
+    "\u0622": "\u0627", "\u0671": "\u0627",  # alef madda, alef wasla -> alef
+    "\u0649": "\u064A",                  # alef maksura -> yeh
+    "\u0629": "\u0647",                  # teh marbuta -> heh
+    "\u0670": None,                      # superscript alef
+}
+_ARABIC_MAP.update({chr(c): None for c in range(0x064B, 0x0653)})  # fathatan..sukun
+
+_LATIN_MAP = {
+    "à": "a", "â": "a", "ä": "a", "á": "a",
+    "é": "e", "è": "e", "ê": "e", "ë": "e",
+    "î": "i", "ï": "i", "í": "i",
+    "ô": "o", "ö": "o", "ó": "o",
+    "ù": "u", "û": "u", "ü": "u", "ú": "u",
+    "ÿ": "y", "ç": "c", "ñ": "n",
+    "œ": "oe", "æ": "ae",
+    "\u2019": "'", "\u2018": "'", "`": "'",
+}
+
+_TABLE = str.maketrans({**_ARABIC_MAP, **_LATIN_MAP})
+
+_ARABIC_RE = re.compile(r"[\u0621-\u064A\u0671-\u06D3]")
+_LATIN_RE = re.compile(r"[A-Za-z\u00C0-\u00D6\u00D8-\u00F6\u00F8-\u024F]")  # skips × and ÷
+_TOKEN_RE = re.compile(r"[\w']+")
+
+# Hassaniya transliterations -> canonical (normalized) service keywords
+HASSANIYA_ALIASES = {
+    "bitaqa": "بطاقه", "betaga": "بطاقه", "batagha": "بطاقه",
+    "jawaz": "جواز", "kahraba": "كهرباء", "kahrba": "كهرباء",
+    "sbitar": "مستشفي", "mustashfa": "مستشفي", "rukhsa": "رخصه", "bermi": "permis",
+}
+
+# French variants -> canonical service keywords
+FRENCH_ALIASES = {
+    "cni": "identite", "passport": "passeport", "courant": "somelec",
+    "medecin": "hopital", "docteur": "hopital", "permi": "permis",
+}
+
+ALIASES = {**HASSANIYA_ALIASES, **FRENCH_ALIASES}
+
+
+class NormalizedQuery(NamedTuple):
+    original: str
+    text: str
+    expanded: str
+    lang: Optional[str]
+
+
+def normalize(text: str) -> str:
+    """Lowercase, fold Arabic/French variants and collapse whitespace"""
+    if not text:
+        return ""
+    return " ".join(text.lower().translate(_TABLE).split())
+
+
+def script_counts(text: str):
+    """Return (arabic_letters, latin_letters) counts for the text"""
+    if not text:
+        return 0, 0
+    return len(_ARABIC_RE.findall(text)), len(_LATIN_RE.findall(text))
+
+
+def detect_lang(text: str) -> Optional[str]:
+    """
+    Detect the script of a text when it is unambiguous
+
+    Returns:
+        'ar' or 'fr' when the text contains letters of only one script, otherwise None
+    """
+    ar, latin = script_counts(text)
+    if ar and not latin:
+        return "ar"
+    if latin and not ar:
+        return "fr"
+    return None
+
+
+def is_in_lang(text: str, lang: str, max_foreign_ratio: float = None) -> bool:
+    """
+    Check that a text is written in the expected language
+
+    Args:
+        text: Text to check
+        lang: Expected language ('fr' or 'ar')
+        max_foreign_ratio: For Arabic, reject texts whose Latin letters reach this
+            fraction of the text length (no limit if omitted)
+
+    Returns:
+        True if the text contains letters of the expected script within the ratio
+    """
+    arabic, latin = script_counts(text)
+    if lang == "ar":
+        if max_foreign_ratio is not None and latin >= len(text) * max_foreign_ratio:
+            return False
+        return arabic > 0
+    return latin > 0
+
+
+def normalize_query(query: str) -> NormalizedQuery:
+    """
+    Normalize a user query once for keyword matching, caching and language checks
+
+    Args:
+        query: Raw user query
+
+    Returns:
+        NormalizedQuery with the folded text, alias-expanded text and detected language
+        (None unless the query is unambiguously in one language)
+    """
+    text = normalize(query)
+    tokens = _TOKEN_RE.findall(text)
+    extra = [ALIASES[tok] for tok in tokens if tok in ALIASES]
+    expanded = f"{text} {' '.join(extra)}" if extra else text
+    
+    lang = detect_lang(text)
+    # Latin-script Hassaniya is not French
+    if lang == "fr" and any(tok in HASSANIYA_ALIASES for tok in tokens):
+        lang = None
+    return NormalizedQuery(query, text, expanded, lang)
\ No newline at end of file